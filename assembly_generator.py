@@ -1,175 +1,235 @@
 # mini_backend.py
 
+import io
 import re
 
-def parse_allocas(ir_lines):
-    offsets = {}
-    offset = -8
-    for line in ir_lines:
-        m = re.match(r'\s*%\"?([\w\.]+)\"? = alloca i32', line)
-        if m:
-            var = m.group(1)
-            offsets[var] = offset
-            offset -= 8
-    return offsets
-
-def ir_to_asm(ir_lines, var_offsets):
-    asm = []
-    asm.append("section .text")
-    asm.append("global main")
-    
-    current_func = None
-
-    for line in ir_lines:
-        line = line.rstrip()
-        
-        # Skip target lines
-        if line.startswith("target") or line.startswith(";"):
-            continue
-
-        # Function start: define i32 @"foo"(...)
-        m = re.match(r'\s*define i32 @"?([\w_]+)"?\(.*\)\s*{', line)
-        if m:
-            func = m.group(1)
-            current_func = func
-            asm.append(f"\n{func}:")
-            # prologue
-            asm += [
-                "    push    rbp",
-                "    mov     rbp, rsp",
-                f"    sub     rsp, {-min(var_offsets.values(), default=0)}"
-            ]
-            continue
-
-        # Function end: }
-        if line.strip() == "}":
-            # epilogue
-            asm += [
-                "    leave",
-                "    ret"
-            ]
-            current_func = None
-            continue
-
-        # Alloca handled by parse_allocas()
-        if "alloca i32" in line:
-            continue
-
-        # store immediate
-        m = re.match(r'\s*store i32 (\d+), i32\* %\"?([\w\.]+)\"?', line)
-        if m:
-            val, var = m.groups()
-            ofs = var_offsets[var]
-            asm.append(f"    mov     DWORD [rbp{ofs:+}], {val}")
-            continue
-
-        # store register result (eax)
-        m = re.match(r'\s*store i32 %\w+, i32\* %\"?([\w\.]+)\"?', line)
-        if m:
-            var = m.group(1)
-            ofs = var_offsets[var]
-            asm.append(f"    mov     [rbp{ofs:+}], eax")
-            continue
-
-        # load into eax
-        m = re.match(r'\s*%(\w+) = load i32, i32\* %\"?([\w\.]+)\"?', line)
-        if m:
-            tmp, var = m.groups()
-            ofs = var_offsets[var]
-            asm.append(f"    mov     eax, DWORD [rbp{ofs:+}]")
-            continue
-
-        # call
-        m = re.match(r'\s*%(\w+) = call i32 @"?([\w_]+)"?\((.*)\)', line)
-        if m:
-            _, func, args = m.groups()
-            # split args: i32 %x, i32 %y
-            parts = [a.strip() for a in args.split(",")]
-            # assume args in order: put first in edi, second in esi
-            for i, part in enumerate(parts):
-                if part.startswith("i32 "):
-                    reg = part.split()[1]
-                    if i == 0:
-                        asm.append(f"    mov     edi, DWORD [rbp{var_offsets.get(reg,0):+}]")
-                    elif i == 1:
-                        asm.append(f"    mov     esi, DWORD [rbp{var_offsets.get(reg,0):+}]")
-            asm.append(f"    call    {func}")
-            asm.append("    mov     eax, eax")
-            continue
-
-        # add
-        if " = add i32 " in line:
-            asm += ["    pop     rbx", "    add     eax, rbx"]
-            continue
-
-        # sub
-        if " = sub i32 " in line:
-            asm += ["    pop     rbx", "    sub     rbx, eax", "    mov     eax, rbx"]
-            continue
-
-        # mul
-        if " = mul i32 " in line:
-            asm += ["    imul    eax, ebx"]
-            continue
-
-        # sdiv
-        if " = sdiv i32 " in line:
-            asm += ["    cqo", "    idiv    ebx"]
-            continue
-
-        # icmp sgt
-        m = re.match(r'\s*%\w+ = icmp sgt i32 %\w+, (\d+)', line)
-        if m:
-            val = m.group(1)
-            asm += [f"    cmp     eax, {val}", "    setg    al", "    movzx   eax, al"]
-            continue
-
-        # icmp ne
-        if " = icmp ne i32 " in line:
-            asm += ["    cmp     eax, 0", "    setne   al", "    movzx   eax, al"]
+# Every IR line shape ir_to_asm understands, in the precedence order of the
+# old if-cascade; m.lastgroup names the outer group that matched.
+_IR_PATTERNS = [
+    # define i32 @"foo"(...)
+    ("define", r'\s*define i32 @"?(?P<define_func>[\w_]+)"?\(.*\)\s*{'),
+    ("end", r'\s*}$'),
+    ("alloca", r'\s*%\"?(?P<alloca_var>[\w\.]+)\"? = alloca i32'),
+    ("store_imm", r'\s*store i32 (?P<store_imm_val>\d+), i32\* %\"?(?P<store_imm_var>[\w\.]+)\"?'),
+    ("store_reg", r'\s*store i32 %\w+, i32\* %\"?(?P<store_reg_var>[\w\.]+)\"?'),
+    ("load", r'\s*%\w+ = load i32, i32\* %\"?(?P<load_var>[\w\.]+)\"?'),
+    ("call", r'\s*%\w+ = call i32 @"?(?P<call_func>[\w_]+)"?\((?P<call_args>.*)\)'),
+    ("add", r'.* = add i32 '),
+    ("sub", r'.* = sub i32 '),
+    ("mul", r'.* = mul i32 '),
+    ("sdiv", r'.* = sdiv i32 '),
+    ("icmp_sgt", r'\s*%\"?(?P<icmp_sgt_dst>[\w\.]+)\"? = icmp sgt i32 %\"?[\w\.]+\"?, (?P<icmp_sgt_val>\d+)'),
+    ("icmp_ne", r'\s*%\"?(?P<icmp_ne_dst>[\w\.]+)\"? = icmp ne i32 '),
+    # br i1 %"cond", label %"then", label %"else"
+    ("cbr", r'\s*br i1 %\"?(?P<cbr_cond>[\w\.]+)\"?, label %\"?(?P<cbr_then>[\w\.]+)\"?, label %\"?(?P<cbr_else>[\w\.]+)\"?'),
+    ("br", r'\s*br label %\"?(?P<br_label>[\w\.]+)\"?'),
+    ("label", r'\s*(?P<label_name>[\w\.]+):'),
+    ("ret_imm", r'\s*ret i32 (?P<ret_imm_val>\d+)'),
+    ("ret_reg", r'.*ret i32 %'),
+]
+
+def _alternation(*names):
+    patterns = dict(_IR_PATTERNS)
+    return re.compile("|".join(f"(?P<{name}>{patterns[name]})" for name in names))
+
+# Lines are classified by their first non-blank character, and only the
+# patterns that can start with it are tried. Anything that falls through is
+# checked against LABEL_RE.
+PREFIX_RES = {
+    'd': _alternation("define"),
+    '}': _alternation("end"),
+    's': _alternation("store_imm", "store_reg"),
+    '%': _alternation("alloca", "load", "call", "add", "sub", "mul", "sdiv", "icmp_sgt", "icmp_ne"),
+    'b': _alternation("cbr", "br"),
+    'r': _alternation("ret_imm", "ret_reg"),
+}
+LABEL_RE = _alternation("label")
+
+# Compare + conditional branch on its result, lowered straight to cmp/jcc
+# (the jump goes to the false label when the condition fails) instead of
+# setcc/movzx followed by a test of al
+CBR_COND_RE = _alternation("cbr")
+CMP_BRANCHES = {
+    "icmp_sgt": "    cmp     eax, {icmp_sgt_val}\n    jle     {cbr_else}\n    jmp     {cbr_then}\n",
+    "icmp_ne": "    cmp     eax, 0\n    je      {cbr_else}\n    jmp     {cbr_then}\n",
+}
+
+# Offsets are assigned as allocas are seen, so a function's prologue (which
+# needs the final stack size) is written only at its closing brace, ahead of
+# the buffered body. The outermost frame is the module itself.
+class Frame:
+    """Stack layout and buffered assembly of the function being translated"""
+    def __init__(self, name=None, parent=None):
+        self.name = name
+        self.parent = parent
+        self.offsets = {}
+        self.next_offset = -8
+        self.body = io.StringIO()
+        self.write = self.body.write
+
+    def alloca(self, var):
+        self.offsets[var] = self.next_offset
+        self.next_offset -= 8
+
+    @property
+    def stack_size(self):
+        return -8 - self.next_offset
+
+def _h_alloca(m, frame):
+    frame.alloca(m.group('alloca_var'))
+
+def _h_define(m, frame):
+    return Frame(m.group('define_func'), frame)
+
+def _flush(frame):
+    # label + prologue, then the buffered body, into the enclosing frame
+    parent = frame.parent
+    parent.write(f"\n{frame.name}:\n"
+                 "    push    rbp\n"
+                 "    mov     rbp, rsp\n"
+                 f"    sub     rsp, {frame.stack_size}\n")
+    parent.write(frame.body.getvalue())
+    return parent
+
+def _h_end(m, frame):
+    # epilogue
+    frame.write("    leave\n    ret\n")
+    if frame.parent is None:
+        return None
+    return _flush(frame)
+
+def _h_store_imm(m, frame):
+    ofs = frame.offsets[m.group('store_imm_var')]
+    frame.write(f"    mov     DWORD [rbp{ofs:+}], {m.group('store_imm_val')}\n")
+
+def _h_store_reg(m, frame):
+    # store register result (eax)
+    ofs = frame.offsets[m.group('store_reg_var')]
+    frame.write(f"    mov     [rbp{ofs:+}], eax\n")
+
+def _h_load(m, frame):
+    # load into eax
+    ofs = frame.offsets[m.group('load_var')]
+    frame.write(f"    mov     eax, DWORD [rbp{ofs:+}]\n")
+
+def _h_call(m, frame):
+    # split args: i32 %x, i32 %y
+    parts = [a.strip() for a in m.group('call_args').split(",")]
+    # assume args in order: put first in edi, second in esi
+    for i, part in enumerate(parts):
+        if part.startswith("i32 "):
+            reg = part.split()[1]
+            if i == 0:
+                frame.write(f"    mov     edi, DWORD [rbp{frame.offsets.get(reg,0):+}]\n")
+            elif i == 1:
+                frame.write(f"    mov     esi, DWORD [rbp{frame.offsets.get(reg,0):+}]\n")
+    frame.write(f"    call    {m.group('call_func')}\n    mov     eax, eax\n")
+
+def _h_add(m, frame):
+    frame.write("    pop     rbx\n    add     eax, rbx\n")
+
+def _h_sub(m, frame):
+    frame.write("    pop     rbx\n    sub     rbx, eax\n    mov     eax, rbx\n")
+
+def _h_mul(m, frame):
+    frame.write("    imul    eax, ebx\n")
+
+def _h_sdiv(m, frame):
+    frame.write("    cqo\n    idiv    ebx\n")
+
+def _h_icmp_sgt(m, frame):
+    frame.write(f"    cmp     eax, {m.group('icmp_sgt_val')}\n    setg    al\n    movzx   eax, al\n")
+
+def _h_icmp_ne(m, frame):
+    frame.write("    cmp     eax, 0\n    setne   al\n    movzx   eax, al\n")
+
+def _h_cbr(m, frame):
+    # conditional branch
+    frame.write(f"    cmp     al, 0\n    je      {m.group('cbr_else')}\n    jmp     {m.group('cbr_then')}\n")
+
+def _h_br(m, frame):
+    # unconditional branch
+    frame.write(f"    jmp     {m.group('br_label')}\n")
+
+def _h_label(m, frame):
+    frame.write(f"{m.group('label_name')}:\n")
+
+def _h_ret_imm(m, frame):
+    frame.write(f"    mov     eax, {m.group('ret_imm_val')}\n    leave\n    ret\n")
+
+def _h_ret_reg(m, frame):
+    frame.write("    ; return in eax\n    leave\n    ret\n")
+
+HANDLERS = {
+    "define": _h_define,
+    "end": _h_end,
+    "alloca": _h_alloca,
+    "store_imm": _h_store_imm,
+    "store_reg": _h_store_reg,
+    "load": _h_load,
+    "call": _h_call,
+    "add": _h_add,
+    "sub": _h_sub,
+    "mul": _h_mul,
+    "sdiv": _h_sdiv,
+    "icmp_sgt": _h_icmp_sgt,
+    "icmp_ne": _h_icmp_ne,
+    "cbr": _h_cbr,
+    "br": _h_br,
+    "label": _h_label,
+    "ret_imm": _h_ret_imm,
+    "ret_reg": _h_ret_reg,
+}
+
+def ir_to_asm(ir_lines):
+    module = frame = Frame()
+    module.write("section .text\nglobal main\n")
+
+    fused = False
+    for i, line in enumerate(ir_lines):
+        # Branch already emitted together with the compare before it
+        if fused:
+            fused = False
             continue
 
-        # conditional branch
-        if line.strip().startswith("br i1"):
-            asm += ["    cmp     al, 0", "    je      else", "    jmp     then"]
-            continue
-
-        # unconditional branch
-        m = re.match(r'\s*br label %\"?([\w\.]+)\"?', line)
-        if m:
-            asm.append(f"    jmp     {m.group(1)}")
-            continue
+        line = line.rstrip()
+        stripped = line.lstrip()
 
-        # labels
-        m = re.match(r'\s*([\w\.]+):', line)
-        if m:
-            asm.append(f"{m.group(1)}:")
+        # Skip target lines
+        if line.startswith("target") or line.startswith(";"):
             continue
 
-        # return immediate
-        m = re.match(r'\s*ret i32 (\d+)', line)
+        regex = PREFIX_RES.get(stripped[:1])
+        m = regex.match(line) if regex else None
+        if m is None:
+            m = LABEL_RE.match(line)
         if m:
-            asm += ["    mov     eax, " + m.group(1), "    leave", "    ret"]
-            continue
-
-        # return register
-        if "ret i32 %" in line:
-            asm += ["    ; return in eax", "    leave", "    ret"]
-            continue
-
+            kind = m.lastgroup
+            if kind in CMP_BRANCHES and i + 1 < len(ir_lines):
+                # One-line lookahead: does the next line branch on this result?
+                b = CBR_COND_RE.match(ir_lines[i + 1])
+                if b and b.group('cbr_cond') == m.group(f"{kind}_dst"):
+                    frame.write(CMP_BRANCHES[kind].format(**m.groupdict(), **b.groupdict()))
+                    fused = True
+                    continue
+            # define/end hand back the frame to continue in
+            frame = HANDLERS[kind](m, frame) or frame
         # everything else
-        if line.strip():
-            asm.append(f"    ; unhandled IR: {line}")
+        elif line.strip():
+            frame.write(f"    ; unhandled IR: {line}\n")
 
-    return "\n".join(asm)
+    # Functions left open by truncated IR are still emitted, just without an epilogue
+    while frame is not module:
+        frame = _flush(frame)
+    return module.body.getvalue()
 
 
 if __name__ == "__main__":
     with open("output.ll") as f:
-        ir_lines = f.readlines()
+        ir_text = f.read()
+    ir_lines = ir_text.split("\n")
 
-    var_offsets = parse_allocas(ir_lines)
-    asm = ir_to_asm(ir_lines, var_offsets)
+    asm = ir_to_asm(ir_lines)
     with open("output.s", "w") as out:
         out.write(asm)
 
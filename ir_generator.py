@@ -1,70 +1,177 @@
-from llvmlite import ir
+from collections import defaultdict
 from llvmlite import binding as llvm
+from parser import (NODE_NAMES, ND_PROGRAM, ND_DECL, ND_INIT, ND_ASSIGN, ND_EXPR_STMT, ND_IF,
+                    ND_RETURN, ND_FUNC, ND_FUNCCALL, ND_BINOP, ND_NUMBER, ND_IDENT)
 
 # Initialize LLVM
 llvm.initialize()
 llvm.initialize_native_target()
 llvm.initialize_native_asmprinter()
 
+# IR text templates, one per instruction kind (everything is i32 for now)
+_ALLOCA = '  {ref} = alloca i32'
+_STORE = '  store i32 {value}, i32* {ptr}'
+_LOAD = '  {ref} = load i32, i32* {ptr}'
+_BINOP = '  {ref} = {op} i32 {lhs}, {rhs}'
+_ICMP = '  {ref} = icmp {pred} i32 {lhs}, {rhs}'
+_ZEXT = '  {ref} = zext i1 {value} to i32'
+_CALL = '  {ref} = call i32 @"{func}"({args})'
+_CBRANCH = '  br i1 {cond}, label %"{then}", label %"{orelse}"'
+_BRANCH = '  br label %"{target}"'
+_RET = '  ret i32 {value}'
+
+class FunctionText:
+    """IR text of one function, kept as a list of lines per basic block"""
+    def __init__(self, name, params=()):
+        self.name = name
+        
+        # Local names are deduplicated the same way llvmlite's NameScope does
+        self._used = {''}
+        self._basenames = defaultdict(int)
+        self.args = [f'%"{self.unique(param)}"' for param in params]
+        
+        # Blocks in creation order; self.block is the insertion point
+        self.blocks = {}
+        self.block = None
+    
+    def unique(self, name):
+        """Return name, suffixed with .N if it is already used in this function"""
+        basename = name
+        while name in self._used:
+            self._basenames[basename] += 1
+            name = f"{basename}.{self._basenames[basename]}"
+        self._used.add(name)
+        return name
+    
+    def ref(self, name):
+        """Reserve a unique local name and return its %"..." reference"""
+        return f'%"{self.unique(name)}"'
+    
+    def append_basic_block(self, name):
+        """Create an empty block and return its label"""
+        label = self.unique(name)
+        self.blocks[label] = []
+        return label
+    
+    def position_at_end(self, label):
+        self.block = self.blocks[label]
+    
+    def emit(self, line):
+        # Nothing may follow a terminator. Stricter than llvmlite's IRBuilder,
+        # which only refuses a second terminator and otherwise appends after one
+        if self.is_terminated:
+            raise ValueError(f"Cannot emit into terminated block in function {self.name}")
+        self.block.append(line)
+    
+    @property
+    def is_terminated(self):
+        return bool(self.block) and self.block[-1].startswith(("  br ", "  ret "))
+    
+    def __str__(self):
+        args = ", ".join(f"i32 {arg}" for arg in self.args)
+        lines = [f'define i32 @"{self.name}"({args})', "{"]
+        for label, body in self.blocks.items():
+            lines.append(f"{label}:")
+            lines += body
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
 class IRGenerator:
+    # Binary operator -> (IR opcode, result name)
+    _BINOPS = {
+        '+': ("add", "addtmp"),
+        '-': ("sub", "subtmp"),
+        '*': ("mul", "multmp"),
+        '/': ("sdiv", "divtmp"),
+    }
+    
     def __init__(self):
-        # Initialize module and builder
-        self.module = ir.Module(name="cc_module")
-        self.builder = None
+        # Module-level state: functions in definition order
+        self.module_name = "cc_module"
+        self.func = None
+        self._func_texts = []
+        self.ir_text = None
         
         # Setup target info for the current machine
         target = llvm.Target.from_default_triple()
         target_machine = target.create_target_machine()
-        self.module.triple = target_machine.triple
+        self.triple = target_machine.triple
         
-        # Symbol table for storing variable addresses
-        self.symbol_table = {}
+        # Symbol table for storing variable addresses; one dict per function
+        # scope, with the innermost scope exposed as self.symbol_table
+        self._scopes = [{}]
+        self.symbol_table = self._scopes[-1]
         
-        # Function table
+        # Function table: name -> number of parameters
         self.functions = {}
         
-        # Define main function type (int main())
-        self.func_type = ir.FunctionType(ir.IntType(32), [], False)
-        
-        # Create int type (default to 32-bit)
-        self.int_type = ir.IntType(32)
-        
+        # Shared constant operand
+        self.zero = "0"
+        
+        # Node type -> handler tables for statements and expressions
+        self._stmt_dispatch = {
+            ND_DECL: self._generate_declaration,
+            ND_ASSIGN: self._generate_assignment,
+            ND_EXPR_STMT: self._generate_expression_statement,
+            ND_IF: self._generate_if,
+            ND_RETURN: self._generate_return,
+            ND_FUNC: self._generate_function_decl,
+        }
+        self._expr_dispatch = {
+            ND_NUMBER: self._generate_number,
+            ND_IDENT: self._generate_identifier,
+            ND_BINOP: self._generate_binary_op,
+            ND_FUNCCALL: self._generate_funccall,
+        }
+    
     def generate_ir(self, ast):
-        """Generate LLVM IR from AST"""
-        if ast.nodetype == "program":
+        """Generate LLVM IR from AST and parse it into a binding-level ModuleRef"""
+        if ast.nodetype == ND_PROGRAM:
             # Create main function
-            main_func = ir.Function(self.module, self.func_type, name="main")
-            block = main_func.append_basic_block(name="entry")
-            self.builder = ir.IRBuilder(block)
+            self.func = self._add_function("main")
+            self.func.position_at_end(self.func.append_basic_block("entry"))
             
             # Generate IR for all statements
             for stmt in ast.children:
                 self._generate_statement(stmt)
             
             # Add a return statement at the end if not present
-            if not self.builder.block.is_terminated:
-                self.builder.ret(ir.Constant(self.int_type, 0))
+            if not self.func.is_terminated:
+                self.func.emit(_RET.format(value=self.zero))
             
-            return self.module
+            self.ir_text = self._module_text()
+            return llvm.parse_assembly(self.ir_text)
         else:
-            raise ValueError(f"Expected program node, got {ast.nodetype}")
+            raise ValueError(f"Expected program node, got {NODE_NAMES[ast.nodetype]}")
+    
+    def _add_function(self, name, params=()):
+        """Register a new function in the module"""
+        if name == "main" and self._func_texts or name in self.functions:
+            raise ValueError(f"Function {name} already defined")
+        func = FunctionText(name, params)
+        self._func_texts.append(func)
+        return func
+    
+    def _module_text(self):
+        """Join the module header and every function into one IR string"""
+        header = "\n".join([
+            f'; ModuleID = "{self.module_name}"',
+            f'target triple = "{self.triple}"',
+            'target datalayout = ""',
+            '',
+        ])
+        return header + "\n" + "\n".join(str(func) for func in self._func_texts)
     
     def _generate_statement(self, node):
         """Generate IR for a statement node"""
-        if node.nodetype == "declaration":
-            self._generate_declaration(node)
-        elif node.nodetype == "assignment":
-            self._generate_assignment(node)
-        elif node.nodetype == "expression_statement":
-            self._generate_expression(node.children[0])  # Just evaluate the expression
-        elif node.nodetype == "if":
-            self._generate_if(node)
-        elif node.nodetype == "return":
-            self._generate_return(node)
-        elif node.nodetype == "function_decl":
-            self._generate_function_decl(node)
-        else:
-            raise ValueError(f"Unknown statement type: {node.nodetype}")
+        handler = self._stmt_dispatch.get(node.nodetype)
+        if handler is None:
+            raise ValueError(f"Unknown statement type: {NODE_NAMES[node.nodetype]}")
+        handler(node)
+    
+    def _generate_expression_statement(self, node):
+        """Generate IR for an expression statement"""
+        self._generate_expression(node.children[0])  # Just evaluate the expression
     
     def _generate_declaration(self, node):
         """Generate IR for variable declaration"""
@@ -72,13 +179,14 @@ class IRGenerator:
         init_node = node.children[0]
         
         # Allocate memory for the variable
-        var_addr = self.builder.alloca(self.int_type, name=var_name)
+        var_addr = self.func.ref(var_name)
+        self.func.emit(_ALLOCA.format(ref=var_addr))
         self.symbol_table[var_name] = var_addr
         
         # If initialized, store the initial value
-        if init_node.nodetype == "init":
+        if init_node.nodetype == ND_INIT:
             init_value = self._generate_expression(init_node.children[0])
-            self.builder.store(init_value, var_addr)
+            self.func.emit(_STORE.format(value=init_value, ptr=var_addr))
     
     def _generate_assignment(self, node):
         """Generate IR for assignment"""
@@ -92,44 +200,49 @@ class IRGenerator:
         expr_value = self._generate_expression(node.children[1])
         
         # Store the value to the variable
-        self.builder.store(expr_value, self.symbol_table[var_name])
+        self.func.emit(_STORE.format(value=expr_value, ptr=self.symbol_table[var_name]))
     
     def _generate_expression(self, node):
-        """Generate IR for expression nodes"""
-        if node.nodetype == "number":
-            return ir.Constant(self.int_type, node.leaf)
-        
-        elif node.nodetype == "identifier":
-            var_name = node.leaf
-            if var_name in self.symbol_table:
-                return self.builder.load(self.symbol_table[var_name], name=f"{var_name}_val")
-            else:
-                raise ValueError(f"Variable {var_name} not in symbol table")
-        
-        elif node.nodetype == "binary_op":
-            left = self._generate_expression(node.children[0])
-            right = self._generate_expression(node.children[1])
-            
-            if node.leaf == '+':
-                return self.builder.add(left, right, name="addtmp")
-            elif node.leaf == '-':
-                return self.builder.sub(left, right, name="subtmp")
-            elif node.leaf == '*':
-                return self.builder.mul(left, right, name="multmp")
-            elif node.leaf == '/':
-                return self.builder.sdiv(left, right, name="divtmp")
-            elif node.leaf == '>':
-                # Compare and convert boolean to int
-                cmp = self.builder.icmp_signed('>', left, right, name="cmptmp")
-                return self.builder.zext(cmp, self.int_type, name="booltmp")
-            else:
-                raise ValueError(f"Unknown binary operator: {node.leaf}")
-        
-        elif node.nodetype == "funccall":
-            return self._generate_funccall(node)
-        
+        """Generate IR for expression nodes; returns the operand text of the result"""
+        handler = self._expr_dispatch.get(node.nodetype)
+        if handler is None:
+            raise ValueError(f"Unknown expression node: {NODE_NAMES[node.nodetype]}")
+        return handler(node)
+    
+    def _generate_number(self, node):
+        """Generate IR for a number literal"""
+        return str(node.leaf)
+    
+    def _generate_identifier(self, node):
+        """Generate IR for a variable read"""
+        var_name = node.leaf
+        if var_name in self.symbol_table:
+            ref = self.func.ref(f"{var_name}_val")
+            self.func.emit(_LOAD.format(ref=ref, ptr=self.symbol_table[var_name]))
+            return ref
         else:
-            raise ValueError(f"Unknown expression node: {node.nodetype}")
+            raise ValueError(f"Variable {var_name} not in symbol table")
+    
+    def _generate_binary_op(self, node):
+        """Generate IR for a binary operation"""
+        left = self._generate_expression(node.children[0])
+        right = self._generate_expression(node.children[1])
+        
+        if node.leaf == '>':
+            # Compare and convert boolean to int
+            cmp = self.func.ref("cmptmp")
+            self.func.emit(_ICMP.format(ref=cmp, pred="sgt", lhs=left, rhs=right))
+            ref = self.func.ref("booltmp")
+            self.func.emit(_ZEXT.format(ref=ref, value=cmp))
+            return ref
+        
+        op = self._BINOPS.get(node.leaf)
+        if op is None:
+            raise ValueError(f"Unknown binary operator: {node.leaf}")
+        opcode, name = op
+        ref = self.func.ref(name)
+        self.func.emit(_BINOP.format(ref=ref, op=opcode, lhs=left, rhs=right))
+        return ref
     
     def _generate_if(self, node):
         """Generate IR for if statement"""
@@ -137,85 +250,72 @@ class IRGenerator:
         cond_value = self._generate_expression(node.children[0])
         
         # Convert condition to a boolean value
-        zero = ir.Constant(self.int_type, 0)
-        cond_bool = self.builder.icmp_signed('!=', cond_value, zero, name="ifcond")
+        cond_bool = self.func.ref("ifcond")
+        self.func.emit(_ICMP.format(ref=cond_bool, pred="ne", lhs=cond_value, rhs=self.zero))
         
         # Create basic blocks for then and else
-        func = self.builder.function
-        then_block = func.append_basic_block(name="then")
-        else_block = func.append_basic_block(name="else")
-        merge_block = func.append_basic_block(name="ifcont")
+        then_block = self.func.append_basic_block("then")
+        else_block = self.func.append_basic_block("else")
+        merge_block = self.func.append_basic_block("ifcont")
         
         # Create conditional branch
-        self.builder.cbranch(cond_bool, then_block, else_block)
+        self.func.emit(_CBRANCH.format(cond=cond_bool, then=then_block, orelse=else_block))
         
         # Generate code for then block
-        self.builder.position_at_end(then_block)
+        self.func.position_at_end(then_block)
         for stmt in node.children[1].children:  # node.children[1] is the block
             self._generate_statement(stmt)
         
         # Branch to merge block if not already terminated
-        if not self.builder.block.is_terminated:
-            self.builder.branch(merge_block)
+        if not self.func.is_terminated:
+            self.func.emit(_BRANCH.format(target=merge_block))
         
         # Generate code for else block (if there is one)
-        self.builder.position_at_end(else_block)
+        self.func.position_at_end(else_block)
         if len(node.children) > 2:  # If there's an else block
             for stmt in node.children[2].children:
                 self._generate_statement(stmt)
         
         # Branch to merge block if not already terminated
-        if not self.builder.block.is_terminated:
-            self.builder.branch(merge_block)
+        if not self.func.is_terminated:
+            self.func.emit(_BRANCH.format(target=merge_block))
         
         # Continue at merge block
-        self.builder.position_at_end(merge_block)
+        self.func.position_at_end(merge_block)
     
     def _generate_return(self, node):
         """Generate IR for return statement"""
         if node.children:
             ret_val = self._generate_expression(node.children[0])
-            self.builder.ret(ret_val)
+            self.func.emit(_RET.format(value=ret_val))
         else:
-            self.builder.ret(ir.Constant(self.int_type, 0))
+            self.func.emit(_RET.format(value=self.zero))
     
     def _generate_function_decl(self, node):
         """Generate IR for function declaration"""
         func_name = node.leaf
+        params = [param_node.leaf for param_node in node.children[0]]
         
-        # Get return type (always int for now)
-        ret_type = self.int_type
-        
-        # Create parameter types (all ints for now)
-        param_types = [self.int_type] * len(node.children[0])
-        
-        # Create function type
-        func_type = ir.FunctionType(ret_type, param_types, False)
-        
-        # Create function
-        func = ir.Function(self.module, func_type, name=func_name)
-        
-        # Name the parameters
-        for i, param_node in enumerate(node.children[0]):
-            func.args[i].name = param_node.leaf
+        # Create function (return and parameter types are always int for now)
+        func = self._add_function(func_name, params)
         
         # Store function in function table
-        self.functions[func_name] = func
+        self.functions[func_name] = len(params)
         
         # Create entry block
-        block = func.append_basic_block(name="entry")
-        old_builder = self.builder
-        self.builder = ir.IRBuilder(block)
+        old_func = self.func
+        self.func = func
+        func.position_at_end(func.append_basic_block("entry"))
         
-        # Create a new symbol table scope
-        old_symbol_table = self.symbol_table
-        self.symbol_table = {}
+        # Push a new symbol table scope
+        self._scopes.append({})
+        self.symbol_table = self._scopes[-1]
         
         # Allocate parameters in the function
-        for i, param_node in enumerate(node.children[0]):
-            param_name = param_node.leaf
-            param_addr = self.builder.alloca(self.int_type, name=param_name)
-            self.builder.store(func.args[i], param_addr)
+        for param_name, arg in zip(params, func.args):
+            param_addr = func.ref(param_name)
+            func.emit(_ALLOCA.format(ref=param_addr))
+            func.emit(_STORE.format(value=arg, ptr=param_addr))
             self.symbol_table[param_name] = param_addr
         
         # Generate IR for function body
@@ -224,12 +324,13 @@ class IRGenerator:
             self._generate_statement(stmt)
         
         # Add implicit return 0 if not already terminated
-        if not self.builder.block.is_terminated:
-            self.builder.ret(ir.Constant(self.int_type, 0))
+        if not func.is_terminated:
+            func.emit(_RET.format(value=self.zero))
         
-        # Restore old symbol table and builder
-        self.symbol_table = old_symbol_table
-        self.builder = old_builder
+        # Pop the function scope and restore the enclosing function
+        self._scopes.pop()
+        self.symbol_table = self._scopes[-1]
+        self.func = old_func
     
     def _generate_funccall(self, node):
         """Generate IR for function call"""
@@ -238,21 +339,24 @@ class IRGenerator:
         if func_name not in self.functions:
             raise ValueError(f"Function {func_name} not declared")
         
-        func = self.functions[func_name]
-        
         # Generate arguments
         args = []
         for arg_node in node.children[0]:
             args.append(self._generate_expression(arg_node))
         
+        if len(args) != self.functions[func_name]:
+            raise ValueError(f"Function {func_name} expects {self.functions[func_name]} arguments, got {len(args)}")
+        
         # Call function
-        return self.builder.call(func, args, name=f"{func_name}_call")
+        ref = self.func.ref(f"{func_name}_call")
+        self.func.emit(_CALL.format(ref=ref, func=func_name, args=", ".join(f"i32 {arg}" for arg in args)))
+        return ref
     
     def print_ir(self):
         """Print the generated IR"""
-        print(str(self.module))
+        print(self.ir_text)
     
     def write_ir_to_file(self, filename):
         """Write the generated IR to a file"""
         with open(filename, 'w') as f:
-            f.write(str(self.module))
+            f.write(self.ir_text)
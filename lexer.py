@@ -1,4 +1,5 @@
-import ply.lex as lex
+import re
+from bisect import bisect_left
 
 # List of token names including keywords and symbols
 tokens = (
@@ -28,21 +29,6 @@ tokens = (
     'FUNCTION',
 )
 
-# Regular expression rules for simple tokens
-t_PLUS    = r'\+'
-t_MINUS   = r'-'
-t_TIMES   = r'\*'
-t_DIVIDE  = r'/'
-t_LPAREN  = r'\('
-t_RPAREN  = r'\)'
-t_SEMI    = r';'
-t_EQUALS  = r'='
-t_COMMA   = r','
-t_LBRACE  = r'\{'
-t_RBRACE  = r'\}'
-t_GT      = r'>'
-t_ARROW   = r'->'  
-
 # Reserved keywords dictionary
 reserved = {
     'if': 'IF',
@@ -55,43 +41,110 @@ reserved = {
     'function': 'FUNCTION'
 }
 
-# Token for identifiers and keywords
-def t_IDENTIFIER(t):
-    r'[A-Za-z_][A-Za-z0-9_]*'
-    t.type = reserved.get(t.value, 'IDENTIFIER')
-    return t
-
-# Token for numbers
-def t_NUMBER(t):
-    r'\d+(\.\d+)?'
-    t.value = float(t.value) if '.' in t.value else int(t.value)
-    return t
-
-# Single-line comments (e.g., // comment)
-def t_COMMENT_SINGLELINE(t):
-    r'//.*'
-    pass
-
-# Multi-line comments (e.g., /* comment */)
-def t_COMMENT_MULTILINE(t):
-    r'/\*(.|\n)*?\*/'
-    t.lexer.lineno += t.value.count('\n')
-    pass
-
-# Characters to ignore (spaces and tabs)
-t_ignore = ' \t'
-
-# Track line numbers
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-def t_error(t):
-    print(f"Illegal character '{t.value[0]}' at line {t.lineno}")
-    t.lexer.skip(1)
+# Token rules in match priority order (same order PLY used: rule functions
+# first, then simple tokens longest-regex first, so '->' wins over '-').
+PATTERNS = [
+    ('IDENTIFIER',         r'[A-Za-z_][A-Za-z0-9_]*'),
+    ('NUMBER',             r'\d+(?:\.\d+)?'),
+    # Single-line comments (e.g., // comment)
+    ('COMMENT_SINGLELINE', r'//.*'),
+    # Multi-line comments (e.g., /* comment */)
+    ('COMMENT_MULTILINE',  r'/\*[\s\S]*?\*/'),
+    # Characters to ignore (spaces, tabs and newlines)
+    ('ignore',             r'[ \t\n]+'),
+    ('ARROW',              r'->'),
+    ('PLUS',               r'\+'),
+    ('TIMES',              r'\*'),
+    ('LPAREN',             r'\('),
+    ('RPAREN',             r'\)'),
+    ('LBRACE',             r'\{'),
+    ('RBRACE',             r'\}'),
+    ('MINUS',              r'-'),
+    ('DIVIDE',             r'/'),
+    ('SEMI',               r';'),
+    ('EQUALS',             r'='),
+    ('COMMA',              r','),
+    ('GT',                 r'>'),
+    # Anything else is an illegal character
+    ('error',              r'.'),
+]
+
+# One anchored master pattern; the name of the matching group is the token type
+MASTER_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in PATTERNS))
+NEWLINE_RE = re.compile(r'\n')
+
+# One lexer input. Tokens point here rather than at the (reusable) Lexer, so
+# their line numbers stay tied to the text they were scanned from.
+class _Source:
+    __slots__ = ("data", "_nl_offsets")
+
+    def __init__(self, data):
+        self.data = data
+        self._nl_offsets = None
+
+    def lineno_at(self, lexpos):
+        # Newline offsets are only collected the first time a line number is needed
+        if self._nl_offsets is None:
+            self._nl_offsets = [m.start() for m in NEWLINE_RE.finditer(self.data)]
+        return bisect_left(self._nl_offsets, lexpos) + 1
+
+class LexToken:
+    def __init__(self, type, value, lexpos, source):
+        self.type = type
+        self.value = value
+        self.lexpos = lexpos
+        self.source = source
+
+    @property
+    def lineno(self):
+        return self.source.lineno_at(self.lexpos)
+
+    def __repr__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+# Drop-in replacement for the PLY lexer object: input(), token() and iteration
+class Lexer:
+    def __init__(self):
+        self.lexdata = ''
+        self.source = _Source('')
+        self._scan = iter(())
+
+    def input(self, data):
+        self.lexdata = data
+        self.source = _Source(data)
+        self._scan = self._tokenize(self.source)
+
+    def lineno_at(self, lexpos):
+        return self.source.lineno_at(lexpos)
+
+    def token(self):
+        return next(self._scan, None)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+    def _tokenize(self, source):
+        for m in MASTER_RE.finditer(source.data):
+            kind = m.lastgroup
+            value = m.group()
+            if kind == 'IDENTIFIER':
+                yield LexToken(reserved.get(value, 'IDENTIFIER'), value, m.start(), source)
+            elif kind == 'NUMBER':
+                value = float(value) if '.' in value else int(value)
+                yield LexToken('NUMBER', value, m.start(), source)
+            elif kind == 'error':
+                print(f"Illegal character '{value}' at line {source.lineno_at(m.start())}")
+            elif kind not in ('ignore', 'COMMENT_SINGLELINE', 'COMMENT_MULTILINE'):
+                yield LexToken(kind, value, m.start(), source)
 
 # Build the lexer
-lexer = lex.lex()
+lexer = Lexer()
 
 if __name__ == '__main__':
     data = "int a = 4; int b = 3;"
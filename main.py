@@ -1,13 +1,14 @@
 # main.py
 
+import json
 import os
+from collections import deque
 from lexer import lexer
-from parser import parser
+from parser import parse, NODE_NAMES
 from semantic import semantic_check
 from ir_generator import IRGenerator
 from graphviz import Digraph
 from llvmlite import binding as llvm
-import re
 
 # Initialize LLVM for assembly emission
 llvm.initialize()
@@ -18,92 +19,34 @@ def visualize_ast(ast, graph=None, parent=None):
     if graph is None:
         graph = Digraph()
 
-    if isinstance(ast, list):
-        for node in ast:
-            visualize_ast(node, graph, parent)
-        return graph
+    # Explicit worklist of (node, parent id) instead of one Python frame per
+    # node; children are pushed in reverse so they come out in source order
+    stack = deque([(ast, parent)])
+    while stack:
+        node, parent = stack.pop()
+        if isinstance(node, list):
+            stack.extend((subnode, parent) for subnode in reversed(node))
+            continue
 
-    node_id = str(id(ast))
-    label = ast.nodetype if ast.leaf is None else f"{ast.nodetype}: {ast.leaf}"
-    graph.node(node_id, label)
+        node_id = str(id(node))
+        name = NODE_NAMES[node.nodetype]
+        label = name if node.leaf is None else f"{name}: {node.leaf}"
+        graph.node(node_id, label)
 
-    if parent:
-        graph.edge(parent, node_id)
+        if parent:
+            graph.edge(parent, node_id)
 
-    for child in ast.children:
-        if isinstance(child, list):
-            for subchild in child:
-                visualize_ast(subchild, graph, node_id)
-        else:
-            visualize_ast(child, graph, node_id)
+        stack.extend((child, node_id) for child in reversed(node.children))
     return graph
 
-def constant_folding(ir_code):
-    optimized_ir = []
-    for line in ir_code:
-        if '=' in line:
-            try:
-                lhs, rhs = line.split('=', 1)
-                rhs = rhs.strip()
-                if '+' in rhs:
-                    parts = [p.strip() for p in rhs.split('+', 1)]
-                    if parts[0].isdigit() and parts[1].isdigit():
-                        result = int(parts[0]) + int(parts[1])
-                        optimized_ir.append(f"{lhs.strip()} = {result}\n")
-                        continue
-                optimized_ir.append(line)
-            except ValueError:
-                optimized_ir.append(line)
-        else:
-            optimized_ir.append(line)
-    return optimized_ir
-
-def dead_code_elimination(ir_code):
-    assignments = {}
-    used = set()
-    optimized_ir = []
-
-    # First pass: collect assignments and track used vars
-    for line in ir_code:
-        if '=' in line and 'alloca' not in line:
-            lhs, rhs = line.split('=', 1)
-            var = lhs.strip().lstrip('%"')
-            assignments[var] = line
-            tokens = re.findall(r'%[\w\.]+', rhs)
-            for tok in tokens:
-                used.add(tok.lstrip('%"'))
-        else:
-            optimized_ir.append(line)
-
-    # Keep only assignments whose LHS was used
-    for var, instr in assignments.items():
-        if var in used:
-            optimized_ir.append(instr)
-
-    return optimized_ir
-
-def strength_reduction(ir_code):
-    optimized_ir = []
-    for line in ir_code:
-        if '*' in line and '=' in line:
-            try:
-                lhs, rhs = line.split('=', 1)
-                rhs = rhs.strip()
-                if rhs.endswith('* 2'):
-                    optimized_ir.append(f"{lhs.strip()} = {rhs.replace('* 2', '<< 1')}\n")
-                    continue
-                optimized_ir.append(line)
-            except ValueError:
-                optimized_ir.append(line)
-        else:
-            optimized_ir.append(line)
-    return optimized_ir
-
-def apply_optimizations(ir_code):
-    ir_code = constant_folding(ir_code)
-    ir_code = dead_code_elimination(ir_code)
-    ir_code = strength_reduction(ir_code)
-    return ir_code
+def optimize_module(mod, opt_level=2):
+    """Run LLVM's standard pass pipeline (folding, DCE, mem2reg, ...) over a parsed module in place"""
+    pmb = llvm.create_pass_manager_builder()
+    pmb.opt_level = opt_level
+    pm = llvm.create_module_pass_manager()
+    pmb.populate(pm)
+    pm.run(mod)
+    return mod
 
 def main():
     # Read source code
@@ -121,23 +64,31 @@ def main():
         print(f"{tok.lineno}: {tok.type}({tok.value})")
 
     # Parsing
-    ast = parser.parse(data)
+    ast = parse(data, lexer=lexer)
     if not ast:
         print("Parsing failed.")
         return
 
     print("\nAbstract Syntax Tree:")
-    print(ast.print_tree())
-
-    # Visualize AST
-    try:
-        out_dir = "build"
-        os.makedirs(out_dir, exist_ok=True)
-        graph = visualize_ast(ast)
-        graph.render(filename="ast", directory=out_dir, view=False)
-        print(f"AST PDF written to {out_dir}/ast.pdf")
-    except Exception as e:
-        print(f"Warning: could not render AST PDF: {e}")
+    # CC_AST_JSON=1 dumps the machine-readable [tag, leaf, children] form instead
+    if os.environ.get('CC_AST_JSON'):
+        print(json.dumps(ast.to_list(), separators=(',', ':')))
+    else:
+        print(ast.print_tree())
+
+    # Visualize AST (opt-in with CC_VIS=1, since it forks Graphviz's dot)
+    if os.environ.get('CC_VIS'):
+        try:
+            graph = visualize_ast(ast)
+            # Render first, so a missing or failing dot leaves no empty file behind
+            svg = graph.pipe(format='svg')
+            out_dir = "build"
+            os.makedirs(out_dir, exist_ok=True)
+            with open(os.path.join(out_dir, "ast.svg"), 'wb') as f:
+                f.write(svg)
+            print(f"AST SVG written to {out_dir}/ast.svg")
+        except Exception as e:
+            print(f"Warning: could not render AST SVG: {e}")
 
     # Semantic analysis
     print("\nSemantic Analysis:")
@@ -147,17 +98,18 @@ def main():
     print("\nGenerating LLVM IR:")
     try:
         ir_gen = IRGenerator()
-        ir_module = ir_gen.generate_ir(ast)
-        ir_text = str(ir_module)
+        mod = ir_gen.generate_ir(ast)
 
         # Write unoptimized IR
         with open('output.ll', 'w') as f:
-            f.write(ir_text)
+            f.write(ir_gen.ir_text)
         print("LLVM IR written to output.ll")
 
-        # Emit assembly from IR
-        mod = llvm.parse_assembly(ir_text)
+        # Verify the IR once; the same ModuleRef is used for both the
+        # unoptimized and (after optimizing in place) optimized outputs
         mod.verify()
+
+        # Emit assembly from IR
         target = llvm.Target.from_default_triple()
         tm = target.create_target_machine()
         asm = tm.emit_assembly(mod)
@@ -165,17 +117,14 @@ def main():
             f.write(asm)
         print("Assembly written to output.s")
 
-        # Apply optimizations to IR text
-        ir_lines = ir_text.splitlines(keepends=True)
-        optimized_lines = apply_optimizations(ir_lines)
+        # Optimize with LLVM's own passes
+        optimize_module(mod)
         with open('optimized_output.ll', 'w') as f:
-            f.writelines(optimized_lines)
+            f.write(str(mod))
         print("Optimized IR written to optimized_output.ll")
 
         # Emit optimized assembly
-        opt_mod = llvm.parse_assembly("".join(optimized_lines))
-        opt_mod.verify()
-        opt_asm = tm.emit_assembly(opt_mod)
+        opt_asm = tm.emit_assembly(mod)
         with open('optimized_output.s', 'w') as f:
             f.write(opt_asm)
         print("Optimized assembly written to optimized_output.s")
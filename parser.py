@@ -1,147 +1,307 @@
-import ply.yacc as yacc
-from lexer import tokens
+import gc
+from sys import intern
+from lexer import lexer
+
+# Node type tags (small ints instead of strings)
+(ND_PROGRAM, ND_BLOCK, ND_DECL, ND_INIT, ND_NOINIT, ND_ASSIGN, ND_EXPR_STMT, ND_IF,
+ ND_RETURN, ND_FUNC, ND_RETURN_TYPE, ND_PARAM, ND_FUNCCALL, ND_BINOP, ND_NUMBER,
+ ND_IDENT) = range(16)
+
+# Tag -> node type name, for printing
+NODE_NAMES = ("program", "block", "declaration", "init", "noinit", "assignment",
+              "expression_statement", "if", "return", "function_decl", "return_type",
+              "param", "funccall", "binary_op", "number", "identifier")
+
+def _indent(level, _cache=[""]):
+    # Indent strings are built once per depth and shared by every node at that depth
+    while len(_cache) <= level:
+        _cache.append(_cache[-1] + "  ")
+    return _cache[level]
 
 # Define a simple AST node class
 class ASTNode:
+    # Fixed attribute layout: no per-node __dict__
+    __slots__ = ("nodetype", "children", "leaf")
+
     def __init__(self, nodetype, children=None, leaf=None):
         self.nodetype = nodetype
         self.children = children if children is not None else []
         self.leaf = leaf
 
     def __str__(self):
-        return f"{self.nodetype}: {self.leaf if self.leaf is not None else ''}"
+        return f"{NODE_NAMES[self.nodetype]}: {self.leaf if self.leaf is not None else ''}"
+
+    def to_list(self):
+        """Compact [tag, leaf, children] form for json.dumps; list-valued children stay nested lists"""
+        return [self.nodetype, self.leaf,
+                [[c.to_list() for c in child] if isinstance(child, list) else child.to_list()
+                 for child in self.children]]
 
     def print_tree(self, level=0):
-        indent = "  " * level
-        output = f"{indent}{self.nodetype}: {self.leaf if self.leaf is not None else ''}\n"
+        out = []
+        self._emit(level, out)
+        return "".join(out)
+
+    def _emit(self, level, out):
+        # Append this subtree's lines to out; joined once by print_tree
+        indent = _indent(level)
+        out.append(f"{indent}{NODE_NAMES[self.nodetype]}: {self.leaf if self.leaf is not None else ''}\n")
         for child in self.children:
             if isinstance(child, list):
                 for subchild in child:
-                    output += subchild.print_tree(level + 1)
+                    subchild._emit(level + 1, out)
             else:
-                output += child.print_tree(level + 1)
-        return output
-
-# Starting rule: a program is a list of statements
-def p_program(p):
-    '''program : statement_list'''
-    p[0] = ASTNode("program", p[1])
-
-def p_statement_list(p):
-    '''statement_list : statement_list statement
-                      | statement'''
-    if len(p) == 3:
-        p[0] = p[1] + [p[2]]
-    else:
-        p[0] = [p[1]]
-
-# Declaration: e.g., int a = 4; or int z;
-def p_statement_declaration(p):
-    '''statement : INT IDENTIFIER declaration_rest'''
-    p[0] = ASTNode("declaration", [p[3]], p[2])
-
-def p_declaration_rest_init(p):
-    '''declaration_rest : EQUALS expression SEMI'''
-    p[0] = ASTNode("init", [p[2]])
-    
-def p_declaration_rest_noinit(p):
-    '''declaration_rest : SEMI'''
-    p[0] = ASTNode("noinit")
-
-# Assignment: e.g., a = 50;
-def p_statement_assignment(p):
-    '''statement : IDENTIFIER EQUALS expression SEMI'''
-    p[0] = ASTNode("assignment", [ASTNode("identifier", leaf=p[1]), p[3]])
-
-# Expression statement: e.g., a + 1;
-def p_statement_expr(p):
-    '''statement : expression SEMI'''
-    p[0] = ASTNode("expression_statement", [p[1]])
-
-# If statement: e.g., if (a > b) { ... }
-def p_statement_if(p):
-    '''statement : IF LPAREN expression RPAREN LBRACE statement_list RBRACE'''
-    p[0] = ASTNode("if", [p[3], ASTNode("block", p[6])])
-
-# Return statement: e.g., return x + y;
-def p_statement_return(p):
-    '''statement : RETURN expression SEMI'''
-    p[0] = ASTNode("return", [p[2]])
-
-# Function declaration:
-# e.g., function sum(int x, int y) -> int { return x + y; }
-def p_statement_function(p):
-    '''statement : FUNCTION IDENTIFIER LPAREN parameter_list RPAREN ARROW INT LBRACE statement_list RBRACE'''
-    p[0] = ASTNode("function_decl", [p[4], ASTNode("return_type", leaf="int"), ASTNode("block", p[9])], p[2])
-
-def p_parameter_list(p):
-    '''parameter_list : parameter_list COMMA parameter
-                      | parameter
-                      | empty'''
-    if len(p) == 4:
-        p[0] = p[1] + [p[3]]
-    elif len(p) == 2:
-        if p[1] is None:
-            p[0] = []
-        else:
-            p[0] = [p[1]]
-
-def p_parameter(p):
-    '''parameter : INT IDENTIFIER'''
-    p[0] = ASTNode("param", leaf=p[2])
-
-def p_empty(p):
-    'empty :'
-    p[0] = None
-
-# Function call expression: e.g., sum(a, b)
-def p_expression_funccall(p):
-    '''expression : IDENTIFIER LPAREN argument_list RPAREN'''
-    p[0] = ASTNode("funccall", [p[3]], p[1])
-
-def p_argument_list(p):
-    '''argument_list : argument_list COMMA expression
-                     | expression
-                     | empty'''
-    if len(p) == 4:
-        p[0] = p[1] + [p[3]]
-    elif len(p) == 2:
-        if p[1] is None:
-            p[0] = []
+                child._emit(level + 1, out)
+
+# Binary operator precedence (higher binds tighter); all are left-associative
+BINARY_PRECEDENCE = {
+    'GT': 1,
+    'PLUS': 2,
+    'MINUS': 2,
+    'TIMES': 3,
+    'DIVIDE': 3,
+}
+
+class ParseError(Exception):
+    pass
+
+# Hand-written recursive-descent parser for the grammar below; expressions
+# use an iterative operator-precedence parse.
+#
+#   program        : statement_list
+#   statement      : INT IDENTIFIER (EQUALS expression)? SEMI
+#                  | IDENTIFIER EQUALS expression SEMI
+#                  | IF LPAREN expression RPAREN LBRACE statement_list RBRACE
+#                  | RETURN expression SEMI
+#                  | FUNCTION IDENTIFIER LPAREN parameter_list RPAREN ARROW INT
+#                    LBRACE statement_list RBRACE
+#                  | expression SEMI
+#   parameter_list : (INT IDENTIFIER (COMMA INT IDENTIFIER)*)?
+#   expression     : expression (PLUS | MINUS | TIMES | DIVIDE | GT) expression
+#                  | IDENTIFIER LPAREN argument_list RPAREN
+#                  | LPAREN expression RPAREN
+#                  | NUMBER
+#                  | IDENTIFIER
+#   argument_list  : (expression (COMMA expression)*)?
+class Parser:
+    def __init__(self):
+        self._toks = []
+        self._types = [None]
+        self._pos = 0
+
+    def parse(self, data, lexer=lexer):
+        """Parse data into a program AST; prints the error and returns None on a syntax error"""
+        lexer.input(data)
+        self._toks = list(lexer)
+        # Trailing None stands for end of input so lookahead never runs off the end
+        self._types = [tok.type for tok in self._toks]
+        self._types.append(None)
+        self._pos = 0
+        try:
+            return self.parse_program()
+        except ParseError as e:
+            print(e)
+            return None
+        finally:
+            self._toks = []
+
+    # Token helpers
+
+    def _error(self):
+        if self._pos < len(self._toks):
+            tok = self._toks[self._pos]
+            return ParseError(f"Syntax error at token '{tok.value}' (line {tok.lineno})")
+        return ParseError("Syntax error at EOF")
+
+    def _expect(self, type):
+        if self._types[self._pos] != type:
+            raise self._error()
+        value = self._toks[self._pos].value
+        self._pos += 1
+        return value
+
+    # Statements
+
+    def parse_program(self):
+        statements = self.parse_statement_list(None)
+        if self._types[self._pos] is not None:
+            raise self._error()
+        return ASTNode(ND_PROGRAM, statements)
+
+    def parse_statement_list(self, end):
+        # One or more statements, up to (not including) the end token type
+        statements = [self.parse_statement()]
+        types = self._types
+        while types[self._pos] != end and types[self._pos] is not None:
+            statements.append(self.parse_statement())
+        return statements
+
+    def parse_statement(self):
+        kind = self._types[self._pos]
+        if kind == 'INT':
+            return self.parse_declaration()
+        if kind == 'IDENTIFIER' and self._types[self._pos + 1] == 'EQUALS':
+            return self.parse_assignment()
+        if kind == 'IF':
+            return self.parse_if()
+        if kind == 'RETURN':
+            self._pos += 1
+            node = ASTNode(ND_RETURN, [self.parse_expression()])
+            self._expect('SEMI')
+            return node
+        if kind == 'FUNCTION':
+            return self.parse_function()
+        # Expression statement: e.g., a + 1;
+        node = ASTNode(ND_EXPR_STMT, [self.parse_expression()])
+        self._expect('SEMI')
+        return node
+
+    # Declaration: e.g., int a = 4; or int z;
+    def parse_declaration(self):
+        self._pos += 1
+        name = intern(self._expect('IDENTIFIER'))
+        kind = self._types[self._pos]
+        if kind == 'EQUALS':
+            self._pos += 1
+            rest = ASTNode(ND_INIT, [self.parse_expression()])
+            self._expect('SEMI')
+        elif kind == 'SEMI':
+            self._pos += 1
+            rest = ASTNode(ND_NOINIT)
         else:
-            p[0] = [p[1]]
-
-# Binary operations and comparisons
-def p_expression_binop(p):
-    '''expression : expression PLUS expression
-                  | expression MINUS expression
-                  | expression TIMES expression
-                  | expression DIVIDE expression
-                  | expression GT expression'''
-    p[0] = ASTNode("binary_op", [p[1], p[3]], p[2])
-
-def p_expression_group(p):
-    '''expression : LPAREN expression RPAREN'''
-    p[0] = p[2]
-
-def p_expression_number(p):
-    '''expression : NUMBER'''
-    p[0] = ASTNode("number", leaf=p[1])
-
-def p_expression_identifier(p):
-    '''expression : IDENTIFIER'''
-    p[0] = ASTNode("identifier", leaf=p[1])
-
-def p_error(p):
-    if p:
-        print(f"Syntax error at token '{p.value}' (line {p.lineno})")
-    else:
-        print("Syntax error at EOF")
+            raise self._error()
+        return ASTNode(ND_DECL, [rest], name)
+
+    # Assignment: e.g., a = 50;
+    def parse_assignment(self):
+        name = intern(self._toks[self._pos].value)
+        self._pos += 2
+        value = self.parse_expression()
+        self._expect('SEMI')
+        return ASTNode(ND_ASSIGN, [ASTNode(ND_IDENT, leaf=name), value])
+
+    # If statement: e.g., if (a > b) { ... }
+    def parse_if(self):
+        self._pos += 1
+        self._expect('LPAREN')
+        cond = self.parse_expression()
+        self._expect('RPAREN')
+        self._expect('LBRACE')
+        body = self.parse_statement_list('RBRACE')
+        self._expect('RBRACE')
+        return ASTNode(ND_IF, [cond, ASTNode(ND_BLOCK, body)])
+
+    # Function declaration:
+    # e.g., function sum(int x, int y) -> int { return x + y; }
+    def parse_function(self):
+        self._pos += 1
+        name = intern(self._expect('IDENTIFIER'))
+        self._expect('LPAREN')
+        params = []
+        if self._types[self._pos] != 'RPAREN':
+            while True:
+                self._expect('INT')
+                params.append(ASTNode(ND_PARAM, leaf=intern(self._expect('IDENTIFIER'))))
+                if self._types[self._pos] != 'COMMA':
+                    break
+                self._pos += 1
+        self._expect('RPAREN')
+        self._expect('ARROW')
+        self._expect('INT')
+        self._expect('LBRACE')
+        body = self.parse_statement_list('RBRACE')
+        self._expect('RBRACE')
+        return ASTNode(ND_FUNC, [params, ASTNode(ND_RETURN_TYPE, leaf="int"), ASTNode(ND_BLOCK, body)], name)
+
+    # Expressions
+
+    def parse_expression(self):
+        # Operator-precedence parse with explicit stacks, so neither parentheses
+        # nor operator chains cost a Python frame per level. ops holds
+        # (prec, op) pairs and None for each open parenthesis.
+        types = self._types
+        toks = self._toks
+        operands = []
+        ops = []
+        open_parens = 0
+        while True:
+            while types[self._pos] == 'LPAREN':
+                ops.append(None)
+                open_parens += 1
+                self._pos += 1
+            operands.append(self.parse_primary())
+            while True:
+                kind = types[self._pos]
+                prec = BINARY_PRECEDENCE.get(kind, 0)
+                if prec:
+                    # Left-associative: fold pending operators that bind at least as tightly
+                    while ops and ops[-1] is not None and ops[-1][0] >= prec:
+                        self._reduce(operands, ops.pop()[1])
+                    ops.append((prec, toks[self._pos].value))
+                    self._pos += 1
+                    break
+                if kind == 'RPAREN' and open_parens:
+                    while ops[-1] is not None:
+                        self._reduce(operands, ops.pop()[1])
+                    ops.pop()
+                    open_parens -= 1
+                    self._pos += 1
+                    continue
+                if open_parens:
+                    raise self._error()
+                while ops:
+                    self._reduce(operands, ops.pop()[1])
+                return operands[0]
+
+    @staticmethod
+    def _reduce(operands, op):
+        right = operands.pop()
+        operands[-1] = ASTNode(ND_BINOP, [operands[-1], right], op)
+
+    def parse_primary(self):
+        # Parenthesized expressions are handled by parse_expression
+        kind = self._types[self._pos]
+        if kind == 'NUMBER':
+            value = self._toks[self._pos].value
+            self._pos += 1
+            return ASTNode(ND_NUMBER, leaf=value)
+        if kind == 'IDENTIFIER':
+            name = intern(self._toks[self._pos].value)
+            self._pos += 1
+            if self._types[self._pos] != 'LPAREN':
+                return ASTNode(ND_IDENT, leaf=name)
+            # Function call expression: e.g., sum(a, b)
+            self._pos += 1
+            args = []
+            if self._types[self._pos] != 'RPAREN':
+                args.append(self.parse_expression())
+                while self._types[self._pos] == 'COMMA':
+                    self._pos += 1
+                    args.append(self.parse_expression())
+            self._expect('RPAREN')
+            return ASTNode(ND_FUNCCALL, [args], name)
+        raise self._error()
 
 # Build the parser
-parser = yacc.yacc()
+parser = Parser()
+
+def parse(data, lexer=lexer):
+    """Parse data into an AST with the cyclic GC paused while nodes are allocated"""
+    # Every node allocated while parsing stays live, so GC passes during the
+    # parse only rescan the growing tree
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return parser.parse(data, lexer=lexer)
+    finally:
+        if was_enabled:
+            gc.enable()
 
 if __name__ == '__main__':
+    # Regression check: deeply nested parentheses must not hit the recursion limit
+    deep = parse("int a = " + "(" * 1000 + "1" + ")" * 1000 + ";")
+    assert deep is not None and deep.children[0].children[0].children[0].leaf == 1
+
     # Read from test_code.txt
     try:
         with open('test_code.txt', 'r') as f:
@@ -150,7 +310,7 @@ if __name__ == '__main__':
         print("Error: 'test_code.txt' not found.")
         exit(1)
         
-    result = parser.parse(data)
+    result = parse(data)
     if result:
         print(result.print_tree())
     else:
@@ -1,4 +1,5 @@
 # Simple SymbolTable implementation for semantic analysis
+from parser import ND_PROGRAM, ND_DECL, ND_INIT, ND_NOINIT, ND_ASSIGN, ND_NUMBER, ND_IDENT
 
 class SymbolTable:
     def __init__(self, parent=None):
@@ -12,95 +13,154 @@ class SymbolTable:
             self.symbols[name] = info
 
     def lookup(self, name):
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent:
-            return self.parent.lookup(name)
+        # Walk outwards through enclosing scopes without recursing
+        table = self
+        while table is not None:
+            symbols = table.symbols
+            if name in symbols:
+                return symbols[name]
+            table = table.parent
         return None
 
+# Each handler performs its own checks and pushes the (node, table) pairs
+# still to visit onto the walker's stack, last child first so they pop in
+# source order. Scope-introducing handlers push a (_SCOPE_EXIT, table)
+# marker underneath their children so the walker can release that scope.
+_SCOPE_EXIT = object()
+
+def _visit(node, sym_table, push):
+    # Identifier and number leaves are checked in place; anything else is
+    # pushed. Only safe while none of the node's earlier children are still
+    # waiting on the stack, or diagnostics would come out of order.
+    tag = node.nodetype
+    if tag == ND_IDENT:
+        _check_identifier(node, sym_table, push)
+    elif tag != ND_NUMBER:
+        push((node, sym_table))
+
+def _check_program(ast, sym_table, push):
+    for stmt in reversed(ast.children):
+        push((stmt, sym_table))
+
+def _check_block(ast, sym_table, push):
+    new_table = SymbolTable(sym_table)
+    push((_SCOPE_EXIT, new_table))
+    for stmt in reversed(ast.children):
+        push((stmt, new_table))
+
+def _check_declaration(ast, sym_table, push):
+    var_name = ast.leaf
+    init_node = ast.children[0]
+    if init_node.nodetype == ND_INIT:
+        sym_table.add(var_name, {"initialized": True})
+        _visit(init_node.children[0], sym_table, push)
+    elif init_node.nodetype == ND_NOINIT:
+        print(f"Semantic error: Variable '{var_name}' is not initialized before use.")
+        # Optionally, do not add it to the symbol table
+
+def _check_assignment(ast, sym_table, push):
+    identifier_node = ast.children[0]
+    var_name = identifier_node.leaf
+    symbol = sym_table.lookup(var_name)
+    if symbol is None:
+        print(f"Semantic error: Variable '{var_name}' is not declared before assignment.")
+    else:
+        symbol["initialized"] = True
+    _visit(ast.children[1], sym_table, push)
+
+def _check_identifier(ast, sym_table, push):
+    var_name = ast.leaf
+    symbol = sym_table.lookup(var_name)
+    if symbol is None or not symbol.get("initialized", False):
+        print(f"Semantic error: Variable '{var_name}' is not initialized before use.")
+
+def _check_binary_op(ast, sym_table, push):
+    left, right = ast.children
+    tag = left.nodetype
+    if tag == ND_IDENT or tag == ND_NUMBER:
+        # The left leaf is done before the right is looked at, so order holds
+        _visit(left, sym_table, push)
+        _visit(right, sym_table, push)
+    else:
+        # Numbers never report anything, so they needn't be visited at all
+        if right.nodetype != ND_NUMBER:
+            push((right, sym_table))
+        push((left, sym_table))
+
+def _check_first_child(ast, sym_table, push):
+    # expression_statement, return, init
+    _visit(ast.children[0], sym_table, push)
+
+def _check_if(ast, sym_table, push):
+    new_table = SymbolTable(sym_table)
+    push((_SCOPE_EXIT, new_table))
+    push((ast.children[1], new_table))
+    push((ast.children[0], sym_table))
+
+def _check_function_decl(ast, sym_table, push):
+    func_name = ast.leaf
+    sym_table.add(func_name, {"initialized": True})
+    new_table = SymbolTable(sym_table)
+    param_list = ast.children[0]
+    if param_list is not None:
+        for param in param_list:
+            new_table.add(param.leaf, {"initialized": True})
+    push((_SCOPE_EXIT, new_table))
+    push((ast.children[2], new_table))
+
+def _check_funccall(ast, sym_table, push):
+    # Process function call arguments
+    for arg in reversed(ast.children[0]):
+        if arg.nodetype != ND_NUMBER:
+            push((arg, sym_table))
+
+def _check_leaf(ast, sym_table, push):
+    # noinit, return_type, param and number nodes have nothing to check
+    pass
+
+# Handlers indexed by node type tag (see parser.NODE_NAMES for the order)
+_HANDLERS = (
+    _check_program,        # ND_PROGRAM
+    _check_block,          # ND_BLOCK
+    _check_declaration,    # ND_DECL
+    _check_first_child,    # ND_INIT
+    _check_leaf,           # ND_NOINIT
+    _check_assignment,     # ND_ASSIGN
+    _check_first_child,    # ND_EXPR_STMT
+    _check_if,             # ND_IF
+    _check_first_child,    # ND_RETURN
+    _check_function_decl,  # ND_FUNC
+    _check_leaf,           # ND_RETURN_TYPE
+    _check_leaf,           # ND_PARAM
+    _check_funccall,       # ND_FUNCCALL
+    _check_binary_op,      # ND_BINOP
+    _check_leaf,           # ND_NUMBER
+    _check_identifier,     # ND_IDENT
+)
+
 def semantic_check(ast, sym_table=None):
     if sym_table is None:
         sym_table = SymbolTable()
 
-    if ast is None:
-        return
-
-    if ast.nodetype == "program":
-        for stmt in ast.children:
-            semantic_check(stmt, sym_table)
-
-    elif ast.nodetype == "block":
-        new_table = SymbolTable(sym_table)
-        for stmt in ast.children:
-            semantic_check(stmt, new_table)
-
-    elif ast.nodetype == "declaration":
-        var_name = ast.leaf
-        init_node = ast.children[0]
-        if init_node.nodetype == "init":
-            sym_table.add(var_name, {"initialized": True})
-            semantic_check(init_node.children[0], sym_table)
-        elif init_node.nodetype == "noinit":
-            print(f"Semantic error: Variable '{var_name}' is not initialized before use.")
-            # Optionally, do not add it to the symbol table
-
-    elif ast.nodetype == "assignment":
-        identifier_node = ast.children[0]
-        var_name = identifier_node.leaf
-        symbol = sym_table.lookup(var_name)
-        if symbol is None:
-            print(f"Semantic error: Variable '{var_name}' is not declared before assignment.")
-        else:
-            symbol["initialized"] = True
-        semantic_check(ast.children[1], sym_table)
-
-    elif ast.nodetype == "identifier":
-        var_name = ast.leaf
-        symbol = sym_table.lookup(var_name)
-        if symbol is None or not symbol.get("initialized", False):
-            print(f"Semantic error: Variable '{var_name}' is not initialized before use.")
-
-    elif ast.nodetype == "binary_op":
-        semantic_check(ast.children[0], sym_table)
-        semantic_check(ast.children[1], sym_table)
-
-    elif ast.nodetype == "expression_statement":
-        semantic_check(ast.children[0], sym_table)
-
-    elif ast.nodetype == "if":
-        semantic_check(ast.children[0], sym_table)
-        new_table = SymbolTable(sym_table)
-        semantic_check(ast.children[1], new_table)
-
-    elif ast.nodetype == "return":
-        semantic_check(ast.children[0], sym_table)
-
-    elif ast.nodetype == "function_decl":
-        func_name = ast.leaf
-        sym_table.add(func_name, {"initialized": True})
-        new_table = SymbolTable(sym_table)
-        param_list = ast.children[0]
-        if param_list is not None:
-            for param in param_list:
-                new_table.add(param.leaf, {"initialized": True})
-        semantic_check(ast.children[2], new_table)
-
-    elif ast.nodetype == "init":
-        semantic_check(ast.children[0], sym_table)
-
-    elif ast.nodetype == "funccall":
-        # Process function call arguments
-        for arg in ast.children[0]:
-            semantic_check(arg, sym_table)
-
-    else:
-        for child in ast.children:
-            semantic_check(child, sym_table)
+    # Explicit worklist instead of recursion: no recursion limit on deeply
+    # nested programs. Handlers push straight onto the stack.
+    stack = [(ast, sym_table)]
+    pop = stack.pop
+    push = stack.append
+    handlers = _HANDLERS
+    while stack:
+        node, tbl = pop()
+        if node is _SCOPE_EXIT:
+            # Leaving the scope: drop its symbols now rather than with the tree
+            tbl.symbols.clear()
+            tbl.parent = None
+        elif node is not None:
+            handlers[node.nodetype](node, tbl, push)
 
 if __name__ == '__main__':
     # Standalone test of semantic analysis
     from parser import ASTNode
-    decl_z = ASTNode("declaration", [ASTNode("noinit")], "z")
-    assign_z = ASTNode("assignment", [ASTNode("identifier", leaf="z"), ASTNode("number", leaf=50)])
-    program_ast = ASTNode("program", [decl_z, assign_z])
+    decl_z = ASTNode(ND_DECL, [ASTNode(ND_NOINIT)], "z")
+    assign_z = ASTNode(ND_ASSIGN, [ASTNode(ND_IDENT, leaf="z"), ASTNode(ND_NUMBER, leaf=50)])
+    program_ast = ASTNode(ND_PROGRAM, [decl_z, assign_z])
     semantic_check(program_ast)